@@ -1,9 +1,9 @@
 from collections.abc import Iterable
 from typing import Optional
 from amaranth import *
-from amaranth.lib.coding import PriorityEncoder
 from transactron import Method, def_method, TModule
 from coreblocks.params import RSLayouts, GenParams, OpType
+from coreblocks.utils import count_trailing_zeros
 from transactron.core import RecordDict
 
 __all__ = ["RS"]
@@ -38,8 +38,6 @@ class RS(Elaboratable):
     def elaborate(self, platform):
         m = TModule()
 
-        m.submodules.enc_select = PriorityEncoder(width=self.rs_entries)
-
         for record in self.data:
             m.d.comb += record.rec_ready.eq(
                 ~record.rs_data.rp_s1.bool() & ~record.rs_data.rp_s2.bool() & record.rec_full.bool()
@@ -48,7 +46,13 @@ class RS(Elaboratable):
         select_vector = Cat(~record.rec_reserved for record in self.data)
         select_possible = select_vector.any()
 
-        take_vector = Cat(record.rec_ready & record.rec_full for record in self.data)
+        # Lowest free entry, found with a log-depth tree instead of a priority chain.
+        # The vector is padded with zeros, as `count_trailing_zeros` needs a power of two width.
+        select_id = Signal(self.rs_entries_bits)
+        padding = C(0, (1 << self.rs_entries_bits) - self.rs_entries)
+        m.d.comb += select_id.eq(count_trailing_zeros(Cat(select_vector, padding)))
+
+        take_vector = Cat(record.rec_ready for record in self.data)
         take_possible = take_vector.any()
 
         ready_lists: list[Value] = []
@@ -56,12 +60,10 @@ class RS(Elaboratable):
             op_vector = Cat(Cat(record.rs_data.exec_fn.op_type == op for op in op_list).any() for record in self.data)
             ready_lists.append(take_vector & op_vector)
 
-        m.d.comb += m.submodules.enc_select.i.eq(select_vector)
-
         @def_method(m, self.select, ready=select_possible)
         def _() -> Signal:
-            m.d.sync += self.data[m.submodules.enc_select.o].rec_reserved.eq(1)
-            return m.submodules.enc_select.o
+            m.d.sync += self.data[select_id].rec_reserved.eq(1)
+            return select_id
 
         @def_method(m, self.insert)
         def _(rs_entry_id: Value, rs_data: Value) -> None:
@@ -2,6 +2,7 @@ from amaranth import *
 from transactron import Method, def_method, Priority, TModule
 from transactron._utils import MethodLayout
 from coreblocks.utils._typing import ValueLike
+from coreblocks.utils.utils import layout_width
 
 
 class BasicFifo(Elaboratable):
@@ -33,7 +34,7 @@ class BasicFifo(Elaboratable):
 
         """
         self.layout = layout
-        self.width = len(Record(self.layout))
+        self.width = layout_width(self.layout)
         self.depth = depth
 
         self.read = Method(o=self.layout)
@@ -4,9 +4,10 @@ from typing import Literal, Optional, TypeAlias, cast, overload
 from collections.abc import Iterable, Mapping
 from amaranth import *
 from amaranth.hdl.ast import Assign, ArrayProxy
+from amaranth.hdl.rec import Layout
 from amaranth.lib import data
 from amaranth.utils import bits_for, log2_int
-from ._typing import ValueLike, LayoutList, SignalBundle, HasElaborate, ModuleLike
+from ._typing import ValueLike, LayoutLike, LayoutList, SignalBundle, HasElaborate, ModuleLike
 
 __all__ = [
     "AssignType",
@@ -22,6 +23,7 @@ __all__ = [
     "popcount",
     "count_leading_zeros",
     "count_trailing_zeros",
+    "layout_width",
 ]
 
 
@@ -336,6 +338,28 @@ def layout_subset(layout: LayoutList, *, fields: set[str]) -> LayoutList:
     return [item for item in layout if item[0] in fields]
 
 
+def layout_width(layout: LayoutLike) -> int:
+    """Width of a record with the given layout.
+
+    Gives the same result as `len(Record(layout))`, but doesn't create
+    any signals for the fields.
+
+    Parameters
+    ----------
+    layout: record layout
+        The layout to measure.
+
+    Returns
+    -------
+    int
+        Total width of all fields in `layout`, in bits.
+    """
+    width = 0
+    for shape, _ in Layout.cast(layout).fields.values():
+        width += layout_width(shape) if isinstance(shape, Layout) else Shape.cast(shape).width
+    return width
+
+
 def flatten_signals(signals: SignalBundle) -> Iterable[Signal]:
     """
     Flattens input data, which can be either a signal, a record, a list (or a dict) of SignalBundle items.
@@ -18,14 +18,11 @@ _T_nested_collection = T | list["_T_nested_collection[T]"] | dict[str, "_T_neste
 
 
 def guard_nested_collection(cont: Any, t: Type[T]) -> TypeGuard[_T_nested_collection[T]]:
-    if isinstance(cont, (list, dict)):
-        if isinstance(cont, dict):
-            cont = cont.values()
-        return all([guard_nested_collection(elem, t) for elem in cont])
-    elif isinstance(cont, t):
-        return True
-    else:
-        return False
+    if isinstance(cont, dict):
+        cont = cont.values()
+    elif not isinstance(cont, list):
+        return isinstance(cont, t)
+    return all(guard_nested_collection(elem, t) for elem in cont)
 
 
 _T_HasElaborate = TypeVar("_T_HasElaborate", bound=HasElaborate)
@@ -44,21 +41,13 @@ class SimpleTestCircuit(Elaboratable, Generic[_T_HasElaborate]):
             container: _T_nested_collection[Method],
         ) -> tuple[_T_nested_collection["TestbenchIO"], Union[ModuleConnector, "TestbenchIO"]]:
             if isinstance(container, list):
-                tb_list = []
-                mc_list = []
-                for elem in container:
-                    tb, mc = transform_methods_to_testbenchios(elem)
-                    tb_list.append(tb)
-                    mc_list.append(mc)
-                return tb_list, ModuleConnector(*mc_list)
+                results = [transform_methods_to_testbenchios(elem) for elem in container]
+                return [tb for tb, _ in results], ModuleConnector(*(mc for _, mc in results))
             elif isinstance(container, dict):
-                tb_dict = {}
-                mc_dict = {}
-                for name, elem in container.items():
-                    tb, mc = transform_methods_to_testbenchios(elem)
-                    tb_dict[name] = tb
-                    mc_dict[name] = mc
-                return tb_dict, ModuleConnector(*mc_dict)
+                named_results = [(name, transform_methods_to_testbenchios(elem)) for name, elem in container.items()]
+                tb_dict = {name: tb for name, (tb, _) in named_results}
+                mc_dict = {name: mc for name, (_, mc) in named_results}
+                return tb_dict, ModuleConnector(**mc_dict)
             else:
                 tb = TestbenchIO(AdapterTrans(container))
                 return tb, tb
@@ -91,8 +80,7 @@ class TestModule(Elaboratable):
         m = Module()
 
         # so that Amaranth allows us to use add_clock
-        _dummy = Signal()
-        m.d.sync += _dummy.eq(1)
+        m.domains.sync = ClockDomain()
 
         m.submodules.tested_module = self.tested_module
 
@@ -4,7 +4,7 @@ from transactron import Method, def_method, TModule
 from transactron.lib import AdapterTrans
 
 
-from ..common import TestCaseWithSimulator, TestbenchIO, data_layout
+from ..common import TestCaseWithSimulator, TestbenchIO, SimpleTestCircuit, data_layout
 
 
 class Echo(Elaboratable):
@@ -45,6 +45,28 @@ class Consumer(Elaboratable):
         return m
 
 
+class EchoDict(Elaboratable):
+    def __init__(self):
+        self.data_bits = 8
+
+        self.layout = data_layout(self.data_bits)
+
+        self.actions = {"a": Method(i=self.layout, o=self.layout), "b": Method(i=self.layout, o=self.layout)}
+
+    def elaborate(self, platform):
+        m = TModule()
+
+        @def_method(m, self.actions["a"], ready=C(1))
+        def _(arg):
+            return arg
+
+        @def_method(m, self.actions["b"], ready=C(1))
+        def _(arg):
+            return {"data": arg.data + 1}
+
+        return m
+
+
 class TestElaboratable(Elaboratable):
     def __init__(self):
         self.echo = Echo()
@@ -77,3 +99,16 @@ class TestAdapterTrans(TestCaseWithSimulator):
 
         with self.run_simulation(t, max_cycles=100) as sim:
             sim.add_sync_process(self.proc)
+
+
+class TestSimpleTestCircuitDict(TestCaseWithSimulator):
+    def test_dict(self):
+        m = SimpleTestCircuit(EchoDict())
+
+        def proc():
+            for expected in [4, 1, 0]:
+                obtained = (yield from m.actions["b"].call(data=expected))["data"]
+                self.assertEqual(expected + 1, obtained)
+
+        with self.run_simulation(m, max_cycles=100) as sim:
+            sim.add_sync_process(proc)
@@ -239,6 +239,175 @@ class TestMemoryBank(TestCaseWithSimulator):
         with self.run_simulation(m) as sim:
             sim.add_sync_process(process)
 
+    def test_safe_writes_not_blocked(self):
+        data_width = 6
+        max_addr = 9
+        m = SimpleTestCircuit(MemoryBank(data_layout=[("data", data_width)], elem_count=max_addr))
+
+        random.seed(14)
+
+        def process():
+            a = 3
+            d1, d2, d3 = (random.randrange(2**data_width) for _ in range(3))
+            yield from m.write.call(data=d1, addr=a)
+            # write to the address being read in the same cycle
+            yield from m.read_req.call_init(addr=a)
+            yield from m.write.call_init(data=d2, addr=a)
+            yield
+            self.assertTrue((yield from m.read_req.done()))
+            self.assertTrue((yield from m.write.done()))
+            # write to the address of a pending read
+            yield from m.read_req.disable()
+            yield from m.write.call_init(data=d3, addr=a)
+            yield
+            self.assertTrue((yield from m.write.done()))
+            yield from m.write.disable()
+            self.assertEqual((yield from m.read_resp.call())["data"], d1)
+            yield from m.read_req.call(addr=a)
+            self.assertEqual((yield from m.read_resp.call())["data"], d3)
+
+        with self.run_simulation(m) as sim:
+            sim.add_sync_process(process)
+
+    @parameterized.expand([(1, 2, 14), (2, 1, 15), (2, 3, 16), (3, 2, 17)])
+    def test_multiport(self, read_ports, write_ports, seed):
+        test_count = 200
+
+        data_width = 6
+        max_addr = 9
+        m = SimpleTestCircuit(
+            MemoryBank(
+                data_layout=[("data", data_width)],
+                elem_count=max_addr,
+                read_ports=read_ports,
+                write_ports=write_ports,
+            )
+        )
+
+        data_dict: dict[int, int] = dict((i, 0) for i in range(max_addr))
+        read_req_queues = [deque() for _ in range(read_ports)]
+
+        random.seed(seed)
+
+        def random_wait(rand: int):
+            yield from self.tick(random.randrange(rand) + 1)
+
+        def writer():
+            for cycle in range(test_count):
+                # distinct addresses, so that the result doesn't depend on write port priority
+                addrs = random.sample(range(max_addr), write_ports)
+                datas = [random.randrange(2**data_width) for _ in range(write_ports)]
+                for write, a, d in zip(m.writes, addrs, datas):
+                    yield from write.call_init(data=d, addr=a)
+                yield
+                for write in m.writes:
+                    self.assertTrue((yield from write.done()))
+                    yield from write.disable()
+                for _ in range(2):
+                    yield Settle()
+                for a, d in zip(addrs, datas):
+                    data_dict[a] = d
+                yield from random_wait(3)
+
+        def reader_req(port: int):
+            def process():
+                for cycle in range(test_count):
+                    a = random.randrange(max_addr)
+                    yield from m.read_reqs[port].call(addr=a)
+                    for _ in range(1):
+                        yield Settle()
+                    read_req_queues[port].append(data_dict[a])
+                    yield from random_wait(2)
+
+            return process
+
+        def reader_resp(port: int):
+            def process():
+                for cycle in range(test_count):
+                    while not read_req_queues[port]:
+                        yield from random_wait(2)
+                    d = read_req_queues[port].popleft()
+                    self.assertEqual((yield from m.read_resps[port].call()), {"data": d})
+                    yield from random_wait(2)
+
+            return process
+
+        with self.run_simulation(m) as sim:
+            sim.add_sync_process(writer)
+            for port in range(read_ports):
+                sim.add_sync_process(reader_req(port))
+                sim.add_sync_process(reader_resp(port))
+
+    @parameterized.expand([(1, True), (1, False), (2, True), (2, False)])
+    def test_granularity(self, write_ports, safe_writes):
+        test_count = 100
+
+        granularity = 2
+        data_width = 8
+        max_addr = 5
+        m = SimpleTestCircuit(
+            MemoryBank(
+                data_layout=[("data", data_width)],
+                elem_count=max_addr,
+                granularity=granularity,
+                safe_writes=safe_writes,
+                write_ports=write_ports,
+            )
+        )
+
+        data_dict: dict[int, int] = dict((i, 0) for i in range(max_addr))
+
+        random.seed(14)
+
+        def process():
+            for cycle in range(test_count):
+                addrs = random.sample(range(max_addr), write_ports)
+                for write, a in zip(m.writes, addrs):
+                    d = random.randrange(2**data_width)
+                    mask = random.randrange(2 ** (data_width // granularity))
+                    yield from write.call(data=d, addr=a, mask=mask)
+                    for i in range(data_width // granularity):
+                        if mask & (1 << i):
+                            granule_mask = (2**granularity - 1) << (i * granularity)
+                            data_dict[a] = (data_dict[a] & ~granule_mask) | (d & granule_mask)
+                a = random.randrange(max_addr)
+                yield from m.read_req.call(addr=a)
+                self.assertEqual((yield from m.read_resp.call()), {"data": data_dict[a]})
+
+        with self.run_simulation(m) as sim:
+            sim.add_sync_process(process)
+
+    def test_multiport_pipelined(self):
+        data_width = 6
+        max_addr = 9
+        m = SimpleTestCircuit(
+            MemoryBank(data_layout=[("data", data_width)], elem_count=max_addr, safe_writes=False, write_ports=2)
+        )
+
+        random.seed(14)
+
+        def process():
+            a = 3
+            d1 = random.randrange(2**data_width)
+            yield from m.writes[0].call_init(data=d1, addr=a)
+            yield from m.read_req.call_init(addr=a)
+            yield
+            d2 = random.randrange(2**data_width)
+            yield from m.writes[0].disable()
+            yield from m.writes[1].call_init(data=d2, addr=a)
+            yield from m.read_resp.call_init()
+            yield
+            yield from m.writes[1].disable()
+            yield from m.read_req.disable()
+            ret_d1 = (yield from m.read_resp.call_result())["data"]
+            self.assertEqual(d1, ret_d1)
+            yield
+            ret_d2 = (yield from m.read_resp.call_result())["data"]
+            self.assertEqual(d2, ret_d2)
+
+        with self.run_simulation(m) as sim:
+            sim.add_sync_process(process)
+
 
 class ManyToOneConnectTransTestCircuit(Elaboratable):
     def __init__(self, count: int, lay: LayoutLike):
@@ -9,6 +9,7 @@ from coreblocks.utils import (
     popcount,
     count_leading_zeros,
     count_trailing_zeros,
+    layout_width,
 )
 from parameterized import parameterized_class
 
@@ -53,6 +54,20 @@ class TestAlignToPowerOfTwo(unittest.TestCase):
             self.assertEqual(expected, out)
 
 
+class TestLayoutWidth(unittest.TestCase):
+    def test_layout_width(self):
+        test_cases = [
+            [("a", 1)],
+            [("a", 3), ("b", signed(5))],
+            [("a", range(10)), ("b", [("c", 2), ("d", [("e", 7)])])],
+            [("a", 4), ("b", 0)],
+            [],
+        ]
+
+        for layout in test_cases:
+            self.assertEqual(layout_width(layout), len(Record(layout)))
+
+
 class PopcountTestCircuit(Elaboratable):
     def __init__(self, size: int):
         self.sig_in = Signal(size)
@@ -175,13 +190,10 @@ class TestCountTrailingZeros(TestCaseWithSimulator):
         yield Settle()
         out_ctz = yield self.m.sig_out
 
-        expected = 0
         if n == 0:
             expected = 2**self.size
         else:
-            while (n & 1) == 0:
-                expected += 1
-                n >>= 1
+            expected = (n & -n).bit_length() - 1
 
         self.assertEqual(out_ctz, expected, f"{n:x}")
 
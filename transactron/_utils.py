@@ -1,5 +1,6 @@
 import itertools
 import sys
+from weakref import WeakKeyDictionary
 from inspect import Parameter, signature
 from typing import Any, Concatenate, Optional, TypeAlias, TypeGuard, TypeVar
 from collections.abc import Callable, Iterable, Mapping
@@ -94,7 +95,7 @@ def _graph_ccs(gr: ROGraph[T]) -> list[GraphCC[T]]:
     ----------
     gr : Mapping[T, Iterable[T]]
         Graph in which we should find connected components. Encoded using
-        adjacency lists.
+        adjacency lists, which should be symmetric.
 
     Returns
     -------
@@ -102,10 +103,12 @@ def _graph_ccs(gr: ROGraph[T]) -> list[GraphCC[T]]:
         Connected components of the graph `gr`.
     """
     ccs = []
-    cc = set()
     visited = set()
 
     for v in gr.keys():
+        if v in visited:
+            continue
+        cc = set()
         q = [v]
         while q:
             w = q.pop()
@@ -113,10 +116,8 @@ def _graph_ccs(gr: ROGraph[T]) -> list[GraphCC[T]]:
                 continue
             visited.add(w)
             cc.add(w)
-            q.extend(gr[w])
-        if cc:
-            ccs.append(cc)
-            cc = set()
+            q.extend(u for u in gr[w] if u not in visited)
+        ccs.append(cc)
 
     return ccs
 
@@ -134,12 +135,31 @@ def has_first_param(func: Callable[..., T], name: str, tp: type[U]) -> TypeGuard
     )
 
 
+_def_helper_plans: "WeakKeyDictionary[Callable[..., Any], dict[Any, tuple[bool, frozenset[str]]]]" = WeakKeyDictionary()
+
+
+def _def_helper_plan(func: Callable[..., Any], tp: type) -> tuple[bool, frozenset[str]]:
+    """Inspects the signature of `func` once and caches how it should be called.
+
+    Returns whether `func` takes a single `arg` parameter of type `tp`, and the names
+    of the parameters which can be passed by keyword.
+    """
+    try:
+        plans = _def_helper_plans.setdefault(func, {})
+    except TypeError:  # func can't be weakly referenced
+        plans = {}
+    if tp not in plans:
+        parameters = signature(func).parameters
+        kw_parameters = frozenset(
+            n for n, p in parameters.items() if p.kind in {Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY}
+        )
+        plans[tp] = (len(parameters) == 1 and has_first_param(func, "arg", tp), kw_parameters)
+    return plans[tp]
+
+
 def def_helper(description, func: Callable[..., T], tp: type[U], arg: U, /, **kwargs) -> T:
-    parameters = signature(func).parameters
-    kw_parameters = set(
-        n for n, p in parameters.items() if p.kind in {Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY}
-    )
-    if len(parameters) == 1 and has_first_param(func, "arg", tp):
+    single_arg, kw_parameters = _def_helper_plan(func, tp)
+    if single_arg:
         return func(arg)
     elif kw_parameters <= kwargs.keys():
         return func(**kwargs)
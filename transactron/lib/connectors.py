@@ -1,6 +1,7 @@
 from amaranth import *
 import amaranth.lib.fifo
 from ..core import *
+from coreblocks.utils import layout_width
 
 __all__ = [
     "FIFO",
@@ -40,7 +41,7 @@ class FIFO(Elaboratable):
             FIFO module conforming to Amaranth library FIFO interface. Defaults
             to SyncFIFO.
         """
-        self.width = len(Record(layout))
+        self.width = layout_width(layout)
         self.depth = depth
         self.fifoType = fifo_type
 
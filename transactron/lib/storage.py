@@ -2,8 +2,8 @@ from amaranth import *
 from amaranth.utils import *
 from ..core import *
 from typing import Optional
-from coreblocks.utils import assign, AssignType
-from .reqres import ArgumentsToResultsZipper
+from coreblocks.utils import layout_width
+from .connectors import Forwarder
 
 __all__ = ["MemoryBank"]
 
@@ -11,24 +11,45 @@ __all__ = ["MemoryBank"]
 class MemoryBank(Elaboratable):
     """MemoryBank module.
 
-    Provides a transactional interface to synchronous Amaranth Memory with one
-    read and one write port. It supports optionally writing with given granularity.
+    Provides a transactional interface to synchronous Amaranth Memory with
+    `read_ports` read and `write_ports` write ports. It supports optionally
+    writing with given granularity.
+
+    Multiple write ports are implemented with a live value table (LVT): every write port
+    has its own copy of the memory, and a register table remembers, for every address
+    (and every granule), which copy was written last. Reads access all copies in parallel
+    and select the data using the table. If several write ports write the same address
+    in the same cycle, the one with the highest index wins.
 
     Attributes
     ----------
-    read_req: Method
-        The read request method. Accepts an `addr` from which data should be read.
+    read_reqs: list[Method]
+        The read request methods, one for every read port. Accept an `addr` from which data should be read.
         Only ready if there is there is a place to buffer response.
+    read_resps: list[Method]
+        The read response methods, one for every read port. Return `data_layout` Record which was saved on
+        `addr` given by last `read_req` method call on the same port. Only ready after `read_req` call.
+    writes: list[Method]
+        The write methods, one for every write port. Accept `addr` where data should be saved, `data` in form
+        of `data_layout` and optionally `mask` if `granularity` is not None. `1` in mask means that appropriate
+        part should be written.
+    read_req: Method
+        The only read request method. Only present if `read_ports` is 1.
     read_resp: Method
-        The read response method. Return `data_layout` Record which was saved on `addr` given by last
-        `read_req` method call. Only ready after `read_req` call.
+        The only read response method. Only present if `read_ports` is 1.
     write: Method
-        The write method. Accepts `addr` where data should be saved, `data` in form of `data_layout`
-        and optionally `mask` if `granularity` is not None. `1` in mask means that appropriate part should be written.
+        The only write method. Only present if `write_ports` is 1.
     """
 
     def __init__(
-        self, *, data_layout: MethodLayout, elem_count: int, granularity: Optional[int] = None, safe_writes: bool = True
+        self,
+        *,
+        data_layout: MethodLayout,
+        elem_count: int,
+        granularity: Optional[int] = None,
+        safe_writes: bool = True,
+        read_ports: int = 1,
+        write_ports: int = 1,
     ):
         """
         Parameters
@@ -41,84 +62,142 @@ class MemoryBank(Elaboratable):
             Granularity of write, forwarded to Amaranth. If `None` the whole record is always saved at once.
             If not, the width of `data_layout` is split into `granularity` parts, which can be saved independently.
         safe_writes: bool
-            Set to `False` if an optimisation can be done to increase throughput of writes. This will cause that
-            writes will be reordered with respect to reads eg. in sequence "read A, write A X", read can return
-            "X" even when write was called later. By default `True`, which disable optimisation.
+            Set to `False` to use a transparent read port. This will cause that writes will be reordered
+            with respect to reads eg. in sequence "read A, write A X", read can return "X" even when write
+            was called later. By default `True`, which keeps the order. Writes are accepted every cycle
+            in both modes.
+        read_ports: int
+            Number of independent read ports. By default 1.
+        write_ports: int
+            Number of independent write ports. By default 1.
         """
         self.data_layout = data_layout
         self.elem_count = elem_count
         self.granularity = granularity
-        self.width = len(Record(self.data_layout))
+        self.width = layout_width(self.data_layout)
         self.addr_width = bits_for(self.elem_count - 1)
         self.safe_writes = safe_writes
+        self.read_ports = read_ports
+        self.write_ports = write_ports
 
         self.read_req_layout = [("addr", self.addr_width)]
         self.write_layout = [("addr", self.addr_width), ("data", self.data_layout)]
         if self.granularity is not None:
             self.write_layout.append(("mask", self.width // self.granularity))
 
-        self.read_req = Method(i=self.read_req_layout)
-        self.read_resp = Method(o=self.data_layout)
-        self.write = Method(i=self.write_layout)
+        self.read_reqs = [Method(i=self.read_req_layout) for _ in range(self.read_ports)]
+        self.read_resps = [Method(o=self.data_layout) for _ in range(self.read_ports)]
+        self.writes = [Method(i=self.write_layout) for _ in range(self.write_ports)]
+        if self.read_ports == 1:
+            self.read_req = self.read_reqs[0]
+            self.read_resp = self.read_resps[0]
+        if self.write_ports == 1:
+            self.write = self.writes[0]
         self._internal_read_resp_trans = None
 
     def elaborate(self, platform) -> TModule:
         m = TModule()
 
-        mem = Memory(width=self.width, depth=self.elem_count)
-        m.submodules.read_port = read_port = mem.read_port()
-        m.submodules.write_port = write_port = mem.write_port()
-        read_output_valid = Signal()
-        prev_read_addr = Signal(self.addr_width)
-        write_pending = Signal()
-        write_req = Signal()
-        write_args = Record(self.write_layout)
-        write_args_prev = Record(self.write_layout)
-        m.d.comb += read_port.addr.eq(prev_read_addr)
-
-        zipper = ArgumentsToResultsZipper([("valid", 1)], self.data_layout)
-        m.submodules.zipper = zipper
-
-        self._internal_read_resp_trans = Transaction()
-        with self._internal_read_resp_trans.body(m, request=read_output_valid):
-            m.d.sync += read_output_valid.eq(0)
-            zipper.write_results(m, read_port.data)
-
-        write_trans = Transaction()
-        with write_trans.body(m, request=write_req | (~read_output_valid & write_pending)):
-            if self.safe_writes:
-                with m.If(write_pending):
-                    m.d.comb += assign(write_args, write_args_prev, fields=AssignType.ALL)
-            m.d.sync += write_pending.eq(0)
-            m.d.comb += write_port.addr.eq(write_args.addr)
-            m.d.comb += write_port.data.eq(write_args.data)
-            if self.granularity is None:
-                m.d.comb += write_port.en.eq(1)
-            else:
-                m.d.comb += write_port.en.eq(write_args.mask)
-
-        @def_method(m, self.read_resp)
-        def _():
-            output = zipper.read(m)
-            return output.results
-
-        @def_method(m, self.read_req, ~write_pending)
-        def _(addr):
-            m.d.sync += read_output_valid.eq(1)
-            m.d.comb += read_port.addr.eq(addr)
-            m.d.sync += prev_read_addr.eq(addr)
-            zipper.write_args(m, valid=1)
-
-        @def_method(m, self.write, ~write_pending)
-        def _(arg):
-            if self.safe_writes:
-                with m.If((arg.addr == read_port.addr) & (read_output_valid | self.read_req.run)):
-                    m.d.sync += write_pending.eq(1)
-                    m.d.sync += assign(write_args_prev, arg, fields=AssignType.ALL)
-                with m.Else():
-                    m.d.comb += write_req.eq(1)
+        granules = 1 if self.granularity is None else self.width // self.granularity
+        granule_width = self.width // granules
+
+        mems = [Memory(width=self.width, depth=self.elem_count) for _ in range(self.write_ports)]
+        write_ports = [mem.write_port(granularity=self.granularity) for mem in mems]
+        write_masks = [Signal(granules) for _ in range(self.write_ports)]
+        for j, write_port in enumerate(write_ports):
+            m.submodules[f"write_port_{j}"] = write_port
+
+        # The LVT stores, for every granule of every address, the index of the memory which holds its newest value.
+        if self.write_ports > 1:
+            lvts = [Array(Signal(range(self.write_ports)) for _ in range(self.elem_count)) for _ in range(granules)]
+        else:
+            lvts = []
+
+        for i, (read_req, read_resp) in enumerate(zip(self.read_reqs, self.read_resps)):
+            # With safe writes, the read port is not transparent and its output is only updated on `read_req`.
+            # This way a write can't change the result of an earlier read, so writes never have to wait.
+            read_ports = [mem.read_port(transparent=not self.safe_writes) for mem in mems]
+            for j, read_port in enumerate(read_ports):
+                m.submodules[f"read_port_{i}_{j}"] = read_port
+            read_output_valid = Signal()
+            read_addr = Signal(self.addr_width)
+            prev_read_addr = Signal(self.addr_width)
+            # A transparent read port is always enabled, so it has to be kept on the last requested address.
+            if not self.safe_writes:
+                m.d.comb += read_addr.eq(prev_read_addr)
+            for read_port in read_ports:
+                m.d.comb += read_port.addr.eq(read_addr)
+                if self.safe_writes:
+                    m.d.comb += read_port.en.eq(read_req.run)
+
+            # The LVT is read in step with the memories, and a transparent read port sees same-cycle writes.
+            read_data = Signal(self.width)
+            if lvts:
+                granule_sels = []
+                for granule, lvt in enumerate(lvts):
+                    granule_sel = Signal(range(self.write_ports))
+                    next_granule_sel = Signal(range(self.write_ports))
+                    m.d.comb += next_granule_sel.eq(lvt[read_addr])
+                    if not self.safe_writes:
+                        for j, (write, write_port, write_mask) in enumerate(zip(self.writes, write_ports, write_masks)):
+                            with m.If(write.run & (write_port.addr == read_addr) & write_mask[granule]):
+                                m.d.comb += next_granule_sel.eq(j)
+                        m.d.sync += granule_sel.eq(next_granule_sel)
+                    else:
+                        with m.If(read_req.run):
+                            m.d.sync += granule_sel.eq(next_granule_sel)
+                    granule_sels.append(granule_sel)
+
+                m.d.comb += read_data.eq(
+                    Cat(
+                        Array(read_port.data.word_select(granule, granule_width) for read_port in read_ports)[sel]
+                        for granule, sel in enumerate(granule_sels)
+                    )
+                )
             else:
-                m.d.comb += write_req.eq(1)
-            m.d.comb += assign(write_args, arg, fields=AssignType.ALL)
+                m.d.comb += read_data.eq(read_ports[0].data)
+
+            # At most two reads can be in flight: one waiting on the read port and one in the forwarder.
+            forwarder = Forwarder(self.data_layout)
+            m.submodules[f"forwarder_{i}"] = forwarder
+            pending_reads = Signal(range(3))
+
+            with m.If(read_req.run & ~read_resp.run):
+                m.d.sync += pending_reads.eq(pending_reads + 1)
+            with m.If(read_resp.run & ~read_req.run):
+                m.d.sync += pending_reads.eq(pending_reads - 1)
+
+            internal_read_resp_trans = Transaction()
+            with internal_read_resp_trans.body(m, request=read_output_valid):
+                m.d.sync += read_output_valid.eq(0)
+                forwarder.write(m, read_data)
+            if self.read_ports == 1:
+                self._internal_read_resp_trans = internal_read_resp_trans
+
+            @def_method(m, read_resp)
+            def _():
+                return forwarder.read(m)
+
+            @def_method(m, read_req, pending_reads < 2)
+            def _(addr):
+                m.d.sync += read_output_valid.eq(1)
+                m.d.comb += read_addr.eq(addr)
+                if not self.safe_writes:
+                    m.d.sync += prev_read_addr.eq(addr)
+
+        for j, (write, write_port, write_mask) in enumerate(zip(self.writes, write_ports, write_masks)):
+
+            @def_method(m, write)
+            def _(arg):
+                m.d.comb += write_port.addr.eq(arg.addr)
+                m.d.comb += write_port.data.eq(arg.data)
+                if self.granularity is None:
+                    m.d.comb += write_mask.eq(1)
+                else:
+                    m.d.comb += write_mask.eq(arg.mask)
+                m.d.comb += write_port.en.eq(write_mask)
+                for granule, lvt in enumerate(lvts):
+                    with m.If(write_mask[granule]):
+                        m.d.sync += lvt[arg.addr].eq(j)
 
         return m